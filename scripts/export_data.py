@@ -1,12 +1,25 @@
 # - Hi future me, remember this wont pull friendlies or gameweek: 0, a value that doesn't exist in your main gameweeks table. So ive filter them out remember when youre working on that next season
 
 import os
+import random
+import re
+import shutil
 import sys
+import time
+import httpx
+import numpy as np
 import pandas as pd
 from supabase import create_client, Client
 from kaggle_secrets import UserSecretsClient
 import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timezone
+from functools import lru_cache
+
+# Copy-on-Write lets column selections, drops and group slices share memory with
+# their source frame. It is always on from pandas 3.0, where the option is deprecated.
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
 
 # --- Configuration ---
 SEASON = "2025-2026"
@@ -20,6 +33,30 @@ TOURNAMENT_NAME_MAP = {
     'uefa-super-cup': 'Uefa Super Cup',
     'efl-cup' : 'EFL Cup'
 }
+# One alternation over every slug, longest first so 'premier-league' wins over 'prem'.
+TOURNAMENT_SLUG_PATTERN = '(' + '|'.join(re.escape(slug) for slug in sorted(TOURNAMENT_NAME_MAP, key=len, reverse=True)) + ')'
+# Every value the pattern can extract is a known slug, so the categories are fixed up front.
+TOURNAMENT_DTYPE = pd.CategoricalDtype(categories=list(TOURNAMENT_NAME_MAP))
+
+TABLE_NAMES = ['gameweeks', 'players', 'playerstats', 'teams', 'matches', 'playermatchstats']
+PAGE_SIZE = 1000
+# Columns each table is paged by; every list ends in a unique key so page
+# boundaries are stable and the ORDER BY can be served from an index.
+PAGINATION_KEYS = {
+    'gameweeks': ['id'],
+    'players': ['player_id'],
+    'playerstats': ['gw', 'id'],
+    'teams': ['id'],
+    'matches': ['gameweek', 'kickoff_time', 'match_id'],
+    'playermatchstats': ['match_id', 'player_id'],
+}
+MAX_PAGE_WORKERS = 8
+# Transient API failures (rate limits, 5xx, dropped connections) are retried
+# with exponential backoff and jitter before a table is given up on.
+FETCH_ATTEMPTS = 6
+FETCH_BACKOFF_SECONDS = 0.5
+FETCH_BACKOFF_MAX_SECONDS = 30
+MAX_WRITE_WORKERS = 8
 
 # --- Logging Setup ---
 logging.basicConfig(level=logging.INFO, format='%(message)s')
@@ -40,6 +77,7 @@ SNAPSHOT_COLS = [
     'cost_change_event', 'transfers_in_event', 'transfers_out_event',
     'value_form', 'value_season', 'ep_next', 'ep_this'
 ]
+FINAL_COLS = ID_COLS + SNAPSHOT_COLS + CUMULATIVE_COLS
 
 
 def initialize_supabase_client() -> Client:
@@ -52,26 +90,208 @@ def initialize_supabase_client() -> Client:
         sys.exit(1)
     return create_client(supabase_url, supabase_key)
 
+def fetch_page(supabase: Client, table_name: str, offset: int, count=None):
+    """
+    Fetches one PAGE_SIZE page of a Supabase table starting at offset. Pages
+    are ordered by the table's key so that concurrently requested ranges
+    neither overlap nor skip rows. Transient failures are retried up to
+    FETCH_ATTEMPTS times; any other error is raised straight away.
+    """
+    for attempt in range(1, FETCH_ATTEMPTS + 1):
+        query = supabase.table(table_name).select("*", count=count)
+        for column in PAGINATION_KEYS.get(table_name, []):
+            query = query.order(column)
+        try:
+            return query.range(offset, offset + PAGE_SIZE - 1).execute()
+        except Exception as e:
+            if attempt == FETCH_ATTEMPTS or not is_transient(e):
+                raise
+            delay = retry_delay(e, attempt)
+            logger.warning(f"  > Fetching '{table_name}' at offset {offset} failed ({e}); retrying in {delay:.1f}s...")
+            time.sleep(delay)
+
+def http_status(error: Exception):
+    """Returns the HTTP status code carried by a failed request's error, if any."""
+    status = getattr(getattr(error, 'response', None), 'status_code', None)
+    if status is None:
+        # postgrest's APIError reports the HTTP status as its code when the
+        # response body is not a PostgREST error (e.g. a gateway 502 or 429).
+        code = str(getattr(error, 'code', ''))
+        status = int(code) if len(code) == 3 and code.isdigit() else None
+    return status
+
+def is_transient(error: Exception) -> bool:
+    """
+    Returns True for failures worth retrying: rate limiting (429), server
+    errors (5xx) and dropped or timed-out connections.
+    """
+    if isinstance(error, (httpx.TransportError, ConnectionError, TimeoutError)):
+        return True
+    status = http_status(error)
+    return status is not None and (status == 429 or 500 <= status <= 599)
+
+def retry_delay(error: Exception, attempt: int) -> float:
+    """
+    Returns how long to wait before retrying a failed request: the server's
+    Retry-After header when it sent one, otherwise exponential backoff with
+    full jitter.
+    """
+    response = getattr(error, 'response', None)
+    retry_after = getattr(response, 'headers', {}).get('Retry-After')
+    if retry_after is not None:
+        try:
+            return min(float(retry_after), FETCH_BACKOFF_MAX_SECONDS)
+        except ValueError:
+            pass
+    return random.uniform(0, min(FETCH_BACKOFF_MAX_SECONDS, FETCH_BACKOFF_SECONDS * 2 ** (attempt - 1)))
+
+def downcast_integers(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Narrows each integer column to the smallest integer dtype that holds its
+    values. This is lossless and prints the same digits; float columns are
+    left alone because float32 would not.
+    """
+    for col in df.select_dtypes('integer').columns:
+        df[col] = pd.to_numeric(df[col], downcast='integer')
+    return df
+
 def fetch_all_rows(supabase: Client, table_name: str) -> pd.DataFrame:
-    """Fetches all rows from a Supabase table, handling pagination."""
+    """
+    Fetches all rows from a Supabase table, handling pagination. The first
+    page also returns the table's row count, so the remaining pages are
+    requested concurrently rather than one round-trip at a time.
+    """
     logger.info(f"Fetching latest data for '{table_name}'...")
-    all_data = []
-    offset = 0
     try:
-        while True:
-            response = supabase.table(table_name).select("*").range(offset, offset + 1000 - 1).execute()
-            batch_data = response.data
-            all_data.extend(batch_data)
-            if len(batch_data) < 1000:
-                break
-            offset += 1000
-        df = pd.DataFrame(all_data)
-        logger.info(f"  > Fetched a total of {len(df)} rows.")
+        first_page = fetch_page(supabase, table_name, 0, count='exact')
+        pages = [first_page.data]
+        remaining_offsets = range(PAGE_SIZE, first_page.count or 0, PAGE_SIZE)
+        if len(first_page.data) == PAGE_SIZE and remaining_offsets:
+            with ThreadPoolExecutor(max_workers=MAX_PAGE_WORKERS) as executor:
+                pages.extend(executor.map(lambda offset: fetch_page(supabase, table_name, offset).data, remaining_offsets))
+
+        # Keep paging past the reported count in case rows were added meanwhile.
+        offset = PAGE_SIZE * len(pages)
+        while len(pages[-1]) == PAGE_SIZE:
+            pages.append(fetch_page(supabase, table_name, offset).data)
+            offset += PAGE_SIZE
+
+        df = downcast_integers(pd.DataFrame([row for page in pages for row in page]))
+        logger.info(f"  > Fetched a total of {len(df)} rows from '{table_name}'.")
         return df
     except Exception as e:
         logger.error(f"An error occurred while fetching from {table_name}: {e}")
         return pd.DataFrame()
 
+def serialize_csv(df: pd.DataFrame) -> bytes:
+    """Renders a DataFrame to CSV bytes without its index, with '\n' line endings on every platform."""
+    return df.to_csv(index=False, lineterminator='\n').encode('utf-8')
+
+def file_has_content(path: str, data: bytes) -> bool:
+    """Checks whether the file at path already holds exactly data; the size is compared before reading."""
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+        with open(path, 'rb') as f:
+            return f.read() == data
+    except OSError:
+        return False
+
+def write_bytes(path: str, data: bytes):
+    """
+    Writes already-serialized file content to path. Files from finished
+    gameweeks rarely change between runs, so a file that already holds
+    exactly data is left untouched.
+    """
+    if file_has_content(path, data):
+        return
+    with open(path, 'wb') as f:
+        f.write(data)
+
+def wait_for_writes(futures):
+    """Blocks until every submitted write has finished, re-raising the first failure."""
+    for future in futures:
+        future.result()
+
+def replace_csv(df: pd.DataFrame, path: str):
+    """
+    Writes a DataFrame to CSV via a temporary file and an atomic rename, so
+    existing hardlinks to path keep their old content. An unchanged file is
+    kept as it is, so links to it stay current.
+    """
+    data = serialize_csv(df)
+    if file_has_content(path, data):
+        return
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def link_or_copy(src: str, dst: str):
+    """Places an identical copy of src at dst, as a hardlink where the filesystem allows it."""
+    if os.path.exists(dst) and os.path.samefile(src, dst):
+        return
+    if os.path.lexists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+def take_group(df: pd.DataFrame, group_rows: dict, key) -> pd.DataFrame:
+    """Returns the rows of df at the positions group_rows holds for key, or none if key has no group."""
+    return df.take(group_rows.get(key, np.array([], dtype=np.intp)))
+
+def list_subdirs(path):
+    """Returns the names of the directories in path, using scandir's cached entry types."""
+    with os.scandir(path) as entries:
+        return [entry.name for entry in entries if entry.is_dir(follow_symlinks=False)]
+
+def read_playerstats(path: str) -> pd.DataFrame:
+    """Reads a playerstats.csv, parsing only the columns the discrete-stat output uses."""
+    return pd.read_csv(path, usecols=lambda col: col in FINAL_COLS)
+
+@lru_cache(maxsize=None)
+def existing_final_cols(columns: tuple) -> list:
+    """
+    Returns the FINAL_COLS present in a frame with the given columns. The
+    playerstats schema rarely changes between gameweeks, so this is cached
+    per distinct schema instead of being rebuilt for every folder.
+    """
+    return [col for col in FINAL_COLS if col in columns]
+
+def subtract_previous_gameweek(current_df: pd.DataFrame, prev_df=None) -> pd.DataFrame:
+    """
+    Converts the cumulative stats in current_df into single-gameweek values by
+    subtracting the matching player's totals from prev_df. For the baseline
+    gameweek prev_df is None and the totals are already single-gameweek values.
+    """
+    if prev_df is None:
+        return current_df[existing_final_cols(tuple(current_df.columns))]
+
+    merged_df = pd.merge(current_df, prev_df[ID_COLS + CUMULATIVE_COLS], on='id', how='left', suffixes=('', '_prev'))
+
+    # Subtract every cumulative column in one vectorized block operation; players
+    # missing from the previous gameweek are treated as starting from zero.
+    cols = [col for col in CUMULATIVE_COLS if col in merged_df.columns and f"{col}_prev" in merged_df.columns]
+    prev_cols = [f"{col}_prev" for col in cols]
+    result_dtypes = {col: np.result_type(merged_df[col].dtype, merged_df[prev].dtype) for col, prev in zip(cols, prev_cols)}
+    # Both blocks are fresh float64 copies, so fill and subtract in place.
+    current = merged_df[cols].to_numpy(dtype=np.float64, copy=True)
+    previous = np.nan_to_num(merged_df[prev_cols].to_numpy(dtype=np.float64, copy=True), copy=False)
+    np.subtract(current, previous, out=current)
+    merged_df[cols] = pd.DataFrame(current, index=merged_df.index, columns=cols).astype(result_dtypes)
+
+    return merged_df[existing_final_cols(tuple(merged_df.columns))]
+
+def write_discrete_gameweek_stats(current_df: pd.DataFrame, prev_df, output_path: str):
+    """
+    Computes the discrete stats for one gameweek folder and writes them to
+    output_path. prev_df is None for the baseline gameweek. Runs in a worker
+    process, so it only relies on its arguments.
+    """
+    write_bytes(output_path, serialize_csv(subtract_previous_gameweek(current_df, prev_df)))
+
 def calculate_discrete_gameweek_stats():
     """
     Calculates discrete gameweek stats for both the main 'By Gameweek'
@@ -86,66 +306,66 @@ def calculate_discrete_gameweek_stats():
         logger.error(f"  > Main 'By Gameweek' directory not found. Aborting calculation.")
         return
 
+    # Each 'By Gameweek' playerstats.csv is needed as the current gameweek, as the
+    # previous gameweek of the next one, and as the baseline for tournament
+    # folders, so parse each file once and reuse it.
+    gameweek_stats = {}
+
+    def load_gameweek_stats(gw_dir):
+        if gw_dir not in gameweek_stats:
+            stats_path = os.path.join(by_gameweek_path, gw_dir, 'playerstats.csv')
+            gameweek_stats[gw_dir] = read_playerstats(stats_path) if os.path.exists(stats_path) else None
+        return gameweek_stats[gw_dir]
+
+    # Folders are only read here; the merge/subtract/write for every folder is
+    # independent, so it is collected into jobs and fanned out to a process pool.
+    jobs = []
+
+    def add_job(current_df, prev_df, output_path):
+        current_df = current_df[existing_final_cols(tuple(current_df.columns))]
+        if prev_df is not None:
+            prev_df = prev_df[ID_COLS + CUMULATIVE_COLS]
+        jobs.append((current_df, prev_df, output_path))
+
     # --- Part 1: Process 'By Gameweek' folders ---
     logger.info("\nProcessing main 'By Gameweek' directory...")
     try:
-        gameweek_dirs = sorted([d for d in os.listdir(by_gameweek_path) if d.startswith('GW')], key=lambda x: int(x[2:]))
+        gameweek_dirs = sorted([d for d in list_subdirs(by_gameweek_path) if d.startswith('GW')], key=lambda x: int(x[2:]))
     except (ValueError, IndexError):
         logger.error("  > Could not parse gameweek numbers. Skipping 'By Gameweek' processing.")
         gameweek_dirs = []
 
     for i, gw_dir in enumerate(gameweek_dirs):
-        current_stats_path = os.path.join(by_gameweek_path, gw_dir, 'playerstats.csv')
-        if not os.path.exists(current_stats_path):
+        current_df = load_gameweek_stats(gw_dir)
+        if current_df is None:
             logger.warning(f"  > {gw_dir}: playerstats.csv not found, skipping.")
             continue
         
-        current_df = pd.read_csv(current_stats_path)
-        
-        # Handle GW1 (baseline)
-        if i == 0:
-            logger.info(f"Processing baseline: {gw_dir}...")
-            final_cols = ID_COLS + SNAPSHOT_COLS + CUMULATIVE_COLS
-            existing_cols = [col for col in final_cols if col in current_df.columns]
-            output_df = current_df[existing_cols]
-        else: # Handle GW2 onwards
-            prev_gw_dir = gameweek_dirs[i-1]
-            logger.info(f"Processing {gw_dir} (comparing with {prev_gw_dir})...")
-            prev_stats_path = os.path.join(by_gameweek_path, prev_gw_dir, 'playerstats.csv')
-
-            if not os.path.exists(prev_stats_path):
+        # The first gameweek is the baseline and has nothing to subtract.
+        prev_df = None
+        if i > 0:
+            prev_df = load_gameweek_stats(gameweek_dirs[i-1])
+
+            if prev_df is None:
                 logger.warning(f"  > Previous gameweek stats not found for {gw_dir}. Skipping.")
                 continue
 
-            prev_df = pd.read_csv(prev_stats_path)
-            merged_df = pd.merge(current_df, prev_df[ID_COLS + CUMULATIVE_COLS], on='id', how='left', suffixes=('', '_prev'))
-            
-            for col in CUMULATIVE_COLS:
-                if col in merged_df.columns and f"{col}_prev" in merged_df.columns:
-                    merged_df[f"{col}_prev"] = merged_df[f"{col}_prev"].fillna(0)
-                    merged_df[col] = merged_df[col] - merged_df[f"{col}_prev"]
-            
-            final_cols = ID_COLS + SNAPSHOT_COLS + CUMULATIVE_COLS
-            existing_final_cols = [col for col in final_cols if col in merged_df.columns]
-            output_df = merged_df[existing_final_cols]
-
-        output_path = os.path.join(by_gameweek_path, gw_dir, output_filename)
-        output_df.to_csv(output_path, index=False)
-        logger.info(f"  > Saved calculated stats for {gw_dir}.")
+        add_job(current_df, prev_df, os.path.join(by_gameweek_path, gw_dir, output_filename))
+    gameweek_jobs = len(jobs)
+    logger.info(f"  > Queued {gameweek_jobs} gameweek folders.")
 
     # --- Part 2: Process 'By Tournament' folders ---
     logger.info("\nProcessing 'By Tournament' sub-directories...")
     if not os.path.isdir(by_tournament_path):
         logger.warning("  > 'By Tournament' directory not found. Skipping.")
-        return
-        
-    for tournament_name in os.listdir(by_tournament_path):
-        tournament_dir = os.path.join(by_tournament_path, tournament_name)
-        if not os.path.isdir(tournament_dir): continue
+        tournament_names = []
+    else:
+        tournament_names = list_subdirs(by_tournament_path)
 
-        logger.info(f"Scanning Tournament: {tournament_name}...")
+    for tournament_name in tournament_names:
+        tournament_dir = os.path.join(by_tournament_path, tournament_name)
         try:
-            tournament_gw_dirs = sorted([d for d in os.listdir(tournament_dir) if d.startswith('GW')], key=lambda x: int(x[2:]))
+            tournament_gw_dirs = sorted([d for d in list_subdirs(tournament_dir) if d.startswith('GW')], key=lambda x: int(x[2:]))
         except (ValueError, IndexError):
             logger.error(f"  > Could not parse gameweek numbers for {tournament_name}. Skipping.")
             continue
@@ -157,34 +377,27 @@ def calculate_discrete_gameweek_stats():
                 logger.warning(f"  > {tournament_name}/{gw_dir}: playerstats.csv not found, skipping.")
                 continue
 
-            current_df = pd.read_csv(current_stats_path)
+            current_df = read_playerstats(current_stats_path)
 
-            if gw_num == 1:
-                final_cols = ID_COLS + SNAPSHOT_COLS + CUMULATIVE_COLS
-                existing_cols = [col for col in final_cols if col in current_df.columns]
-                output_df = current_df[existing_cols]
-            else:
+            prev_df = None
+            if gw_num != 1:
                 # IMPORTANT: Previous stats are always sourced from the main 'By Gameweek' folder
-                prev_stats_path = os.path.join(by_gameweek_path, f'GW{gw_num - 1}', 'playerstats.csv')
-                if not os.path.exists(prev_stats_path):
+                prev_df = load_gameweek_stats(f'GW{gw_num - 1}')
+                if prev_df is None:
                     logger.warning(f"  > {tournament_name}/{gw_dir}: Baseline stats from GW{gw_num - 1} not found. Skipping.")
                     continue
-                
-                prev_df = pd.read_csv(prev_stats_path)
-                merged_df = pd.merge(current_df, prev_df[ID_COLS + CUMULATIVE_COLS], on='id', how='left', suffixes=('', '_prev'))
-                
-                for col in CUMULATIVE_COLS:
-                    if col in merged_df.columns and f"{col}_prev" in merged_df.columns:
-                        merged_df[f"{col}_prev"] = merged_df[f"{col}_prev"].fillna(0)
-                        merged_df[col] = merged_df[col] - merged_df[f"{col}_prev"]
-
-                final_cols = ID_COLS + SNAPSHOT_COLS + CUMULATIVE_COLS
-                existing_final_cols = [col for col in final_cols if col in merged_df.columns]
-                output_df = merged_df[existing_final_cols]
             
-            output_path = os.path.join(tournament_dir, gw_dir, output_filename)
-            output_df.to_csv(output_path, index=False)
-            logger.info(f"  > Saved calculated stats for {tournament_name}/{gw_dir}.")
+            add_job(current_df, prev_df, os.path.join(tournament_dir, gw_dir, output_filename))
+    logger.info(f"  > Queued {len(jobs) - gameweek_jobs} tournament gameweek folders.")
+
+    # --- Part 3: Compute and save every folder in parallel ---
+    if not jobs:
+        return
+    current_dfs, prev_dfs, output_paths = zip(*jobs)
+    with ProcessPoolExecutor() as executor:
+        for _ in executor.map(write_discrete_gameweek_stats, current_dfs, prev_dfs, output_paths):
+            pass
+    logger.info(f"  > Saved calculated stats for {len(jobs)} folders.")
 
 
 def main():
@@ -195,12 +408,16 @@ def main():
     supabase = initialize_supabase_client()
 
     # --- Fetch ALL data at the beginning ---
-    gameweeks_df = fetch_all_rows(supabase, 'gameweeks')
-    players_df = fetch_all_rows(supabase, 'players')
-    playerstats_df = fetch_all_rows(supabase, 'playerstats')
-    teams_df = fetch_all_rows(supabase, 'teams')
-    matches_df = fetch_all_rows(supabase, 'matches')
-    playermatchstats_df = fetch_all_rows(supabase, 'playermatchstats')
+    # The tables are independent, so fetch them concurrently.
+    with ThreadPoolExecutor(max_workers=len(TABLE_NAMES)) as executor:
+        futures = {name: executor.submit(fetch_all_rows, supabase, name) for name in TABLE_NAMES}
+        tables = {name: future.result() for name, future in futures.items()}
+    gameweeks_df = tables['gameweeks']
+    players_df = tables['players']
+    playerstats_df = tables['playerstats']
+    teams_df = tables['teams']
+    matches_df = tables['matches']
+    playermatchstats_df = tables['playermatchstats']
 
     essential_dfs = [gameweeks_df, players_df, playerstats_df, teams_df, matches_df]
     if any(df.empty for df in essential_dfs):
@@ -208,13 +425,7 @@ def main():
         sys.exit(1)
 
     # --- Data Pre-processing ---
-    def extract_tournament_slug(match_id):
-        if not isinstance(match_id, str): return None
-        for slug in TOURNAMENT_NAME_MAP.keys():
-            if slug in match_id:
-                return slug
-        return None
-    matches_df['tournament'] = matches_df['match_id'].apply(extract_tournament_slug)
+    matches_df['tournament'] = matches_df['match_id'].str.extract(TOURNAMENT_SLUG_PATTERN, expand=False)
 
     logger.info("\nFiltering out friendlies and pre-season (GW0) matches...")
     initial_match_count = len(matches_df)
@@ -222,64 +433,117 @@ def main():
     final_match_count = len(matches_df)
     logger.info(f"  > Removed {initial_match_count - final_match_count} matches. Processing {final_match_count} relevant matches.")
 
+    # Tournament and match_id are repeated strings used as grouping and join keys;
+    # as categoricals, the groupbys and merge below compare integer codes instead.
+    # playermatchstats shares the matches dtype so both sides use the same codes;
+    # its categories cover both tables, since player stats can reference matches
+    # that were filtered out above.
+    matches_df['tournament'] = matches_df['tournament'].astype(TOURNAMENT_DTYPE)
+    match_ids = pd.concat([matches_df['match_id'], playermatchstats_df['match_id']]).dropna().unique()
+    match_id_dtype = pd.CategoricalDtype(categories=pd.Index(match_ids).sort_values())
+    matches_df['match_id'] = matches_df['match_id'].astype(match_id_dtype)
+    playermatchstats_df['match_id'] = playermatchstats_df['match_id'].astype(match_id_dtype)
+
     # --- 1. Update Master Data Files ---
     logger.info("\n--- 1. Updating Master Data Files ---")
     os.makedirs(BASE_DATA_PATH, exist_ok=True)
-    gameweeks_df.to_csv(os.path.join(BASE_DATA_PATH, 'gameweek_summaries.csv'), index=False)
-    players_df.to_csv(os.path.join(BASE_DATA_PATH, 'players.csv'), index=False)
-    playerstats_df.to_csv(os.path.join(BASE_DATA_PATH, 'playerstats.csv'), index=False)
-    teams_df.to_csv(os.path.join(BASE_DATA_PATH, 'teams.csv'), index=False)
+    write_bytes(os.path.join(BASE_DATA_PATH, 'gameweek_summaries.csv'), serialize_csv(gameweeks_df))
+    write_bytes(os.path.join(BASE_DATA_PATH, 'playerstats.csv'), serialize_csv(playerstats_df))
+    # players.csv and teams.csv are identical in every gameweek folder, so the
+    # master copies are written once and linked into each folder below.
+    master_players_path = os.path.join(BASE_DATA_PATH, 'players.csv')
+    master_teams_path = os.path.join(BASE_DATA_PATH, 'teams.csv')
+    replace_csv(players_df, master_players_path)
+    replace_csv(teams_df, master_teams_path)
     logger.info("  > Master files updated successfully.")
 
+    # --- Partition the tables once so the fanout loops below only do lookups ---
+    empty_matches = matches_df.iloc[0:0]
+    matches_by_gw = dict(tuple(matches_df.groupby('gameweek', sort=True)))
+    matches_by_tournament = {
+        slug: dict(tuple(group.groupby('gameweek', sort=True)))
+        for slug, group in matches_df.groupby('tournament', sort=False, observed=True)
+    }
+    playerstats_by_gw = dict(tuple(playerstats_df.groupby('gw', sort=False)))
+    empty_playerstats = playerstats_df.iloc[0:0]
+
+    # Attach each match's tournament and gameweek to its player stats in one merge
+    # and group by those keys. Each partition is kept as row positions into the
+    # stats without the temporary key columns, and taken only when it is written.
+    key_cols = ['_tournament', '_gameweek']
+    match_keys = matches_df[['match_id', 'tournament', 'gameweek']].drop_duplicates().set_axis(['match_id'] + key_cols, axis=1)
+    pms_keyed = playermatchstats_df.merge(match_keys, on='match_id', how='inner')
+    pms_rows = pms_keyed.drop(columns=key_cols)
+    pms_rows_by_gw = pms_keyed.groupby('_gameweek', sort=False).indices
+    pms_rows_by_tournament_gw = pms_keyed.groupby(key_cols, sort=False, observed=True).indices
+
+    # Folder CSVs are serialized on this thread as each folder is visited and
+    # handed to a writer pool, so formatting the next file overlaps the disk
+    # writes of the previous ones.
+    writer = ThreadPoolExecutor(max_workers=MAX_WRITE_WORKERS)
+    pending_writes = {}
+
+    def queue_write(path, data):
+        # Slugs that share a folder name write the same paths; the later write must land last.
+        if path in pending_writes:
+            pending_writes[path].result()
+        pending_writes[path] = writer.submit(write_bytes, path, data)
+
+    # Gameweek id -> finished flag, so the loops below check membership by hash lookup.
+    known_gameweeks = gameweeks_df[gameweeks_df['id'].notna()]
+    gw_finished = dict(zip(known_gameweeks['id'].astype(int), known_gameweeks['finished']))
+
     # --- 2. Populate 'By Tournament' Folders ---
     logger.info("\n--- 2. Populating 'By Tournament' Folders ---")
-    unique_tournaments = matches_df['tournament'].dropna().unique()
-    for slug in unique_tournaments:
+    for slug, tournament_matches_by_gw in matches_by_tournament.items():
         folder_name = TOURNAMENT_NAME_MAP.get(slug, slug.replace('-', ' ').title())
-        logger.info(f"Processing Tournament: {folder_name}...")
-        
-        tournament_matches = matches_df[matches_df['tournament'] == slug]
-        gws_in_tournament = sorted(tournament_matches['gameweek'].dropna().unique().astype(int))
+        populated_gws = 0
 
-        for gw in gws_in_tournament:
-            if gw not in gameweeks_df['id'].values: continue
-            is_finished = gameweeks_df.loc[gameweeks_df['id'] == gw, 'finished'].iloc[0]
+        for gw, gw_tournament_matches in tournament_matches_by_gw.items():
+            gw = int(gw)
+            if gw not in gw_finished: continue
+            populated_gws += 1
+            is_finished = gw_finished[gw]
             
             tournament_gw_path = os.path.join(BASE_DATA_PATH, 'By Tournament', folder_name, f'GW{gw}')
             os.makedirs(tournament_gw_path, exist_ok=True)
             
-            gw_tournament_matches = tournament_matches[tournament_matches['gameweek'] == gw]
-            match_ids = gw_tournament_matches['match_id'].unique().tolist()
-            gw_tournament_playerstats = playermatchstats_df[playermatchstats_df['match_id'].isin(match_ids)]
+            gw_tournament_playerstats = take_group(pms_rows, pms_rows_by_tournament_gw, (slug, gw))
             
-            gw_tournament_matches.to_csv(os.path.join(tournament_gw_path, 'matches.csv'), index=False)
-            gw_tournament_playerstats.to_csv(os.path.join(tournament_gw_path, 'playermatchstats.csv'), index=False)
-            gw_tournament_matches.to_csv(os.path.join(tournament_gw_path, 'fixtures.csv'), index=False)
-            players_df.to_csv(os.path.join(tournament_gw_path, 'players.csv'), index=False)
-            teams_df.to_csv(os.path.join(tournament_gw_path, 'teams.csv'), index=False)
-            playerstats_df[playerstats_df['gw'] == gw].to_csv(os.path.join(tournament_gw_path, 'playerstats.csv'), index=False)
+            # fixtures.csv carries the same rows as matches.csv, so it is serialized once.
+            matches_csv = serialize_csv(gw_tournament_matches)
+            queue_write(os.path.join(tournament_gw_path, 'matches.csv'), matches_csv)
+            queue_write(os.path.join(tournament_gw_path, 'playermatchstats.csv'), serialize_csv(gw_tournament_playerstats))
+            queue_write(os.path.join(tournament_gw_path, 'fixtures.csv'), matches_csv)
+            link_or_copy(master_players_path, os.path.join(tournament_gw_path, 'players.csv'))
+            link_or_copy(master_teams_path, os.path.join(tournament_gw_path, 'teams.csv'))
+            queue_write(os.path.join(tournament_gw_path, 'playerstats.csv'), serialize_csv(playerstats_by_gw.get(gw, empty_playerstats)))
+        logger.info(f"  > {folder_name}: populated {populated_gws} gameweek folders.")
 
     # --- 3. Populate 'By Gameweek' Folders ---
     logger.info("\n--- 3. Populating 'By Gameweek' Folders ---")
-    unique_gameweeks = sorted(gameweeks_df['id'].dropna().unique().astype(int))
+    unique_gameweeks = sorted(gw_finished)
 
     for gw in unique_gameweeks:
-        if gw not in gameweeks_df['id'].values: continue
         
         gw_path = os.path.join(BASE_DATA_PATH, 'By Gameweek', f'GW{gw}')
         os.makedirs(gw_path, exist_ok=True)
         
-        gw_matches = matches_df[matches_df['gameweek'] == gw]
-        match_ids = gw_matches['match_id'].unique().tolist()
-        gw_playermatchstats = playermatchstats_df[playermatchstats_df['match_id'].isin(match_ids)]
+        gw_matches = matches_by_gw.get(gw, empty_matches)
+        gw_playermatchstats = take_group(pms_rows, pms_rows_by_gw, gw)
         
-        gw_matches.to_csv(os.path.join(gw_path, 'matches.csv'), index=False)
-        gw_playermatchstats.to_csv(os.path.join(gw_path, 'playermatchstats.csv'), index=False)
-        gw_matches.to_csv(os.path.join(gw_path, 'fixtures.csv'), index=False)
-        players_df.to_csv(os.path.join(gw_path, 'players.csv'), index=False)
-        teams_df.to_csv(os.path.join(gw_path, 'teams.csv'), index=False)
-        playerstats_df[playerstats_df['gw'] == gw].to_csv(os.path.join(gw_path, 'playerstats.csv'), index=False)
-        logger.info(f"Populated data for GW{gw}.")
+        matches_csv = serialize_csv(gw_matches)
+        queue_write(os.path.join(gw_path, 'matches.csv'), matches_csv)
+        queue_write(os.path.join(gw_path, 'playermatchstats.csv'), serialize_csv(gw_playermatchstats))
+        queue_write(os.path.join(gw_path, 'fixtures.csv'), matches_csv)
+        link_or_copy(master_players_path, os.path.join(gw_path, 'players.csv'))
+        link_or_copy(master_teams_path, os.path.join(gw_path, 'teams.csv'))
+        queue_write(os.path.join(gw_path, 'playerstats.csv'), serialize_csv(playerstats_by_gw.get(gw, empty_playerstats)))
+    logger.info(f"  > Populated {len(unique_gameweeks)} gameweek folders.")
+
+    # The discrete-stat pass reads these playerstats files, so drain before it.
+    wait_for_writes(pending_writes.values())
+    writer.shutdown()
 
     # --- 4. Perform the discrete gameweek calculation ---
     calculate_discrete_gameweek_stats()
@@ -16,10 +16,9 @@ def update_matches_by_gameweek(season_path):
     gw_base_path = os.path.join(season_path, 'matches', 'gameweeks')
     create_directory(gw_base_path)
 
-    for gw in matches_df['gameweek'].unique():
+    for gw, gw_matches in matches_df.groupby('gameweek', sort=False):
         gw_path = os.path.join(gw_base_path, f'GW{gw}')
         create_directory(gw_path)
-        gw_matches = matches_df[matches_df['gameweek'] == gw]
         gw_matches.to_csv(os.path.join(gw_path, 'matches.csv'), index=False)
         print(f"Updated GW{gw} with {len(gw_matches)} matches")
 
@@ -46,12 +45,10 @@ def update_player_match_stats(season_path, matches_df):
     total_stats = len(stats_df)
     print(f"Found {total_stats} player match stats across all gameweeks")
 
-    for gw in stats_df['gameweek'].unique():
-        if pd.isna(gw):
-            continue  # Skip if gameweek is missing
+    # groupby leaves out stats with a missing gameweek
+    for gw, gw_stats in stats_df.groupby('gameweek', sort=False):
         gw_path = os.path.join(gw_base_path, f'GW{gw}')
         create_directory(gw_path)
-        gw_stats = stats_df[stats_df['gameweek'] == gw]
         gw_stats.to_csv(os.path.join(gw_path, 'playermatchstats.csv'), index=False)
         print(f"Updated GW{gw} with {len(gw_stats)} player match stats")
 
@@ -38,14 +38,11 @@ def main():
         print("\n🔄 Splitting matches by gameweek...")
         matches_dir = matches_file.parent
         
-        for gw in gameweeks:
+        for gw, gw_matches in matches_df.groupby('gameweek', sort=True):
             # Create GW folder
             gw_folder = matches_dir / f"GW{gw}"
             gw_folder.mkdir(exist_ok=True)
             
-            # Filter matches for this gameweek
-            gw_matches = matches_df[matches_df['gameweek'] == gw]
-            
             # Save matches for this gameweek
             output_file = gw_folder / "matches.csv"
             gw_matches.to_csv(output_file, index=False)
@@ -68,16 +65,17 @@ def main():
         # Split player stats by gameweek
         print("\n🔄 Splitting player stats by gameweek...")
         playerstats_dir = playerstats_file.parent
+        stats_by_gw = dict(tuple(playerstats_df.groupby('gameweek', sort=False)))
         
         for gw in gameweeks:
             # Create GW folder
             gw_folder = playerstats_dir / f"GW{gw}"
             gw_folder.mkdir(exist_ok=True)
             
-            # Filter player stats for this gameweek
-            gw_stats = playerstats_df[playerstats_df['gameweek'] == gw]
+            # Player stats for this gameweek, if any
+            gw_stats = stats_by_gw.get(gw)
             
-            if len(gw_stats) > 0:
+            if gw_stats is not None:
                 # Remove the temporary gameweek column before saving
                 gw_stats_clean = gw_stats.drop('gameweek', axis=1)
                 
@@ -3,10 +3,62 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 
+CSV_BUFFER_SIZE = 1 << 20
+
 def create_directory(path):
     """Create directory if it doesn't exist"""
     Path(path).mkdir(parents=True, exist_ok=True)
 
+def write_csv(df, file_path, mode='w', header=True):
+    """Write df without its index through a large buffer, with '\n' line endings"""
+    with open(file_path, mode, encoding='utf-8', newline='', buffering=CSV_BUFFER_SIZE) as f:
+        df.to_csv(f, index=False, header=header, lineterminator='\n')
+
+def align_columns(existing_df, df):
+    """Adds each DataFrame's missing columns to the other as empty columns"""
+    existing_df = existing_df.assign(**{col: None for col in df.columns if col not in existing_df.columns})
+    df = df.assign(**{col: None for col in existing_df.columns if col not in df.columns})
+    return existing_df, df
+
+def read_keys(file_path, df, unique_cols):
+    """
+    Reads the unique_cols columns of file_path in df's dtypes, so that keys
+    compare by value. Returns None when the file's keys do not parse as those
+    dtypes (e.g. a gap in an integer column).
+    """
+    try:
+        return pd.read_csv(file_path, usecols=unique_cols, dtype=df[unique_cols].dtypes.to_dict())
+    except (ValueError, TypeError):
+        return None
+
+def update_csv(df, file_path, unique_cols):
+    """
+    Merges df into the CSV at file_path, keeping the last row for each
+    unique_cols key. When the file already has df's columns and none of its
+    keys, the new rows are appended instead of rewriting the whole file.
+    Returns the merged row count and df aligned to the file's columns.
+    """
+    if not os.path.exists(file_path):
+        updated_df = df.drop_duplicates(subset=unique_cols, keep='last', ignore_index=True)
+        write_csv(updated_df, file_path)
+        return len(updated_df), df
+
+    # Only the header and key columns are parsed to decide whether appending is safe
+    if pd.read_csv(file_path, nrows=0).columns.tolist() == df.columns.tolist():
+        new_rows = df.drop_duplicates(subset=unique_cols, keep='last')
+        # Null keys and keys that don't parse in df's dtypes go through the full merge
+        existing_keys = None if new_rows[unique_cols].isna().any().any() else read_keys(file_path, df, unique_cols)
+        if existing_keys is not None:
+            new_keys = pd.MultiIndex.from_frame(new_rows[unique_cols])
+            if not new_keys.isin(pd.MultiIndex.from_frame(existing_keys)).any():
+                write_csv(new_rows, file_path, mode='a', header=False)
+                return len(existing_keys) + len(new_rows), df
+
+    existing_df, df = align_columns(pd.read_csv(file_path), df)
+    updated_df = pd.concat([existing_df, df], ignore_index=True).drop_duplicates(subset=unique_cols, keep='last', ignore_index=True)
+    write_csv(updated_df, file_path)
+    return len(updated_df), df
+
 def get_latest_finished_gameweek(season_path):
     """
     Finds the latest gameweek where at least one match has finished = True.
@@ -16,7 +68,8 @@ def get_latest_finished_gameweek(season_path):
         print(f"Matches file not found at {matches_path}")
         return None
 
-    matches_df = pd.read_csv(matches_path)
+    # Only the two columns the lookup uses are parsed
+    matches_df = pd.read_csv(matches_path, usecols=['gameweek', 'finished'])
 
     # Convert 'finished' column to boolean if it's not already
     if matches_df['finished'].dtype != bool:
@@ -46,13 +99,12 @@ def update_matches_by_gameweek(season_path, latest_finished_gameweek):
     gw_base_path = os.path.join(season_path, 'matches', 'gameweeks')
 
     # Split and save by gameweek, only for gameweeks >= latest_finished_gameweek
-    for gw in matches_df['gameweek'].unique():
+    for gw, gw_matches in matches_df.groupby('gameweek', sort=False):
         if gw >= latest_finished_gameweek:
             gw_path = os.path.join(gw_base_path, f'GW{gw}')
             create_directory(gw_path)
 
-            gw_matches = matches_df[matches_df['gameweek'] == gw]
-            gw_matches.to_csv(os.path.join(gw_path, 'matches.csv'), index=False)
+            write_csv(gw_matches, os.path.join(gw_path, 'matches.csv'))
             print(f"Updated GW{gw} with {len(gw_matches)} matches")
         else:
             print(f"Skipping GW{gw} (before latest finished gameweek).")
@@ -75,64 +127,33 @@ def update_player_match_stats(season_path, matches_df, latest_finished_gameweek)
     match_to_gw = dict(zip(matches_df['match_id'], matches_df['gameweek']))
     stats_df['gameweek'] = stats_df['match_id'].map(match_to_gw)
 
-    # Update or add data by gameweek and match_id
-    for gw in stats_df['gameweek'].unique():
-        if pd.isna(gw):
-            print(f"Skipping records with missing gameweek")
-            continue
+    if stats_df['gameweek'].isna().any():
+        print(f"Skipping records with missing gameweek")
 
+    # Update or add data by gameweek and match_id
+    for gw, gw_stats in stats_df.groupby('gameweek', sort=False):
         gw_int = int(gw)
         gw_path = os.path.join(gw_base_path, f'GW{gw_int}')
         create_directory(gw_path)
 
-        gw_stats = stats_df[stats_df['gameweek'] == gw]
-
-        # Check if gameweek exists
         existing_gw_stats_path = os.path.join(gw_path, 'playermatchstats.csv')
-        if os.path.exists(existing_gw_stats_path):
-            existing_gw_stats_df = pd.read_csv(existing_gw_stats_path)
-            # Ensure consistent columns before merging
-            for col in gw_stats.columns:
-                if col not in existing_gw_stats_df.columns:
-                    existing_gw_stats_df[col] = None
-            for col in existing_gw_stats_df.columns:
-                if col not in gw_stats.columns:
-                    gw_stats[col] = None
-        else:
-            existing_gw_stats_df = pd.DataFrame(columns=gw_stats.columns)
 
         # Skip only if gw is before latest_finished_gameweek AND no new data needs to be added
         if gw_int >= latest_finished_gameweek:
-            # Merge and update
-            updated_gw_stats = pd.concat([existing_gw_stats_df, gw_stats]).drop_duplicates(subset=['player_id', 'match_id'], keep='last')
-            updated_gw_stats.to_csv(existing_gw_stats_path, index=False)
-            print(f"Updated GW{gw_int} with {len(updated_gw_stats)} player stats")
+            # Merge and update; gw_stats comes back with any columns the existing file adds
+            updated_gw_count, gw_stats = update_csv(gw_stats, existing_gw_stats_path, ['player_id', 'match_id'])
+            print(f"Updated GW{gw_int} with {updated_gw_count} player stats")
 
-            for match_id in gw_stats['match_id'].unique():
+            for match_id, match_stats in gw_stats.groupby('match_id', sort=False):
                 match_id_str = str(match_id)
                 match_path = os.path.join(gw_path, 'matches', match_id_str)
                 create_directory(match_path)
 
-                match_stats = gw_stats[gw_stats['match_id'] == match_id]
                 match_stats_path = os.path.join(match_path, 'playermatchstats.csv')
 
-                # Check if match exists
-                if os.path.exists(match_stats_path):
-                    existing_match_stats_df = pd.read_csv(match_stats_path)
-                    # Ensure consistent columns before merging
-                    for col in match_stats.columns:
-                        if col not in existing_match_stats_df.columns:
-                            existing_match_stats_df[col] = None
-                    for col in existing_match_stats_df.columns:
-                        if col not in match_stats.columns:
-                            match_stats[col] = None
-                else:
-                    existing_match_stats_df = pd.DataFrame(columns=match_stats.columns)
-
                 # Merge and update
-                updated_match_stats = pd.concat([existing_match_stats_df, match_stats]).drop_duplicates(subset=['player_id', 'match_id'], keep='last')
-                updated_match_stats.to_csv(match_stats_path, index=False)
-                print(f"  - Updated Match {match_id_str} in GW{gw_int} with {len(updated_match_stats)} player stats")
+                updated_match_count, _ = update_csv(match_stats, match_stats_path, ['player_id', 'match_id'])
+                print(f"  - Updated Match {match_id_str} in GW{gw_int} with {updated_match_count} player stats")
         else:
             print(f"Skipping GW{gw_int} (before latest finished gameweek).")
 
@@ -149,39 +170,24 @@ def update_player_stats(season_path, latest_finished_gameweek):
     gw_base_path = os.path.join(season_path, 'playerstats', 'gameweeks')
 
     # Update or add data by gameweek
-    for gw in stats_df['gw'].unique():
+    for gw, gw_stats in stats_df.groupby('gw', sort=False):
         gw_path = os.path.join(gw_base_path, f'GW{gw}')
         create_directory(gw_path)
 
-        gw_stats = stats_df[stats_df['gw'] == gw]
+        # Skip only if gw is before latest_finished_gameweek AND no new data needs to be added
+        if gw < latest_finished_gameweek:
+            print(f"Skipping GW{gw} (before latest finished gameweek).")
+            continue
 
         existing_gw_stats_path = os.path.join(gw_path, 'playerstats.csv')
         if os.path.exists(existing_gw_stats_path):
-            existing_gw_stats_df = pd.read_csv(existing_gw_stats_path)
-
-            # Ensure consistent columns before merging
-            for col in gw_stats.columns:
-                if col not in existing_gw_stats_df.columns:
-                    existing_gw_stats_df[col] = None
-            for col in existing_gw_stats_df.columns:
-                if col not in gw_stats.columns:
-                    gw_stats[col] = None
-
-            # Skip only if gw is before latest_finished_gameweek AND no new data needs to be added
-            if gw >= latest_finished_gameweek:
-                # Merge data, keeping the latest
-                updated_gw_stats = pd.concat([existing_gw_stats_df, gw_stats]).drop_duplicates(subset=['id', 'gw'], keep='last')
-                updated_gw_stats.to_csv(existing_gw_stats_path, index=False)
-                print(f"Updated GW{gw} with {len(updated_gw_stats)} player stats")
-            else:
-                print(f"Skipping GW{gw} (before latest finished gameweek).")
+            # Merge data, keeping the latest
+            updated_gw_count, _ = update_csv(gw_stats, existing_gw_stats_path, ['id', 'gw'])
+            print(f"Updated GW{gw} with {updated_gw_count} player stats")
         else:
             # Only create if it's a new gameweek that should be processed
-            if gw >= latest_finished_gameweek:
-                gw_stats.to_csv(os.path.join(gw_path, 'playerstats.csv'), index=False)
-                print(f"Created GW{gw} with {len(gw_stats)} player stats")
-            else:
-                print(f"Skipping GW{gw} (before latest finished gameweek).")
+            write_csv(gw_stats, existing_gw_stats_path)
+            print(f"Created GW{gw} with {len(gw_stats)} player stats")
 
 def main():
     season = "2024-2025"
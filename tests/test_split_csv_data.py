@@ -0,0 +1,42 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+from split_csv_data import update_csv
+
+
+class UpdateCsvTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'playermatchstats.csv')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_float_keys_do_not_duplicate_int_keys_on_disk(self):
+        pd.DataFrame({'player_id': [1, 2], 'match_id': ['a', 'a'], 'goals': [0, 1]}).to_csv(self.path, index=False)
+        df = pd.DataFrame({'player_id': [1.0, 2.0], 'match_id': ['a', 'a'], 'goals': [1, 1]})
+
+        count, _ = update_csv(df, self.path, ['player_id', 'match_id'])
+
+        result = pd.read_csv(self.path)
+        self.assertEqual(count, 2)
+        self.assertEqual(len(result), 2)
+        self.assertEqual(result['goals'].tolist(), [1, 1])
+
+    def test_new_keys_are_appended(self):
+        pd.DataFrame({'player_id': [1], 'match_id': ['a'], 'goals': [0]}).to_csv(self.path, index=False)
+        df = pd.DataFrame({'player_id': [2], 'match_id': ['a'], 'goals': [1]})
+
+        count, _ = update_csv(df, self.path, ['player_id', 'match_id'])
+
+        self.assertEqual(count, 2)
+        self.assertEqual(pd.read_csv(self.path)['player_id'].tolist(), [1, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()